@@ -1,56 +1,77 @@
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from pymongo import MongoClient
 from werkzeug.security import generate_password_hash, check_password_hash
+from flask.cli import AppGroup
 from dotenv import load_dotenv
+import click
+import logging
 import os
+import threading
 from functools import wraps
 from datetime import timedelta
 import pytz
+import assets
+import fragments
+import metrics
+from faq_search import NO_MATCH_ANSWER
+from faq_store import FAQStore
+from fragments import bump_version, fragment_cache, read_versions
+from storage import CollectionProxy, DatabaseProxy, Storage
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger('campus.app')
+
 app = Flask(__name__)  # Fix: Use __name, not _name
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'your_secret_key')
 app.permanent_session_lifetime = timedelta(minutes=30)
 
-# MongoDB Setup
-try:
-    client = MongoClient(os.getenv("MONGO_URI"))
-    db = client['campusApp']
+# Performance instrumentation (/metrics, slow-request log)
+metrics.init_app(app)
+
+# Compiled templates persist across restarts; fragments are cached per data version
+fragments.init_app(app)
+
+# Fingerprinted static assets under /assets and compressed HTML/JSON responses
+assets.init_app(app)
+
+# MongoDB Setup (connects lazily on first use; "mongomock://" selects the in-memory backend)
+app.config['MONGO_URI'] = os.getenv("MONGO_URI")
+storage = Storage(app)
+db = DatabaseProxy(storage)
+
+# Initialize collection references
+users = CollectionProxy(storage, 'users')
+students = CollectionProxy(storage, 'students')
+activities = CollectionProxy(storage, 'activities')
+events = CollectionProxy(storage, 'events')
+resources_collection = CollectionProxy(storage, 'resources')
+announcements_collection = CollectionProxy(storage, 'announcements')
+# Version counters for the cached dashboard fragments, bumped by every writer
+data_versions = CollectionProxy(storage, 'data_versions')
+
+@storage.on_connect
+def init_database(database):
     # Required collections
-    collections = ['users', 'students', 'activities', 'events', 'notifications', 'resources', 'announcements']
+    collections = ['users', 'students', 'activities', 'events', 'notifications', 'resources', 'announcements',
+                   'faqs', 'faq_meta', 'data_versions']
+    existing = database.list_collection_names()
     for collection_name in collections:
-        if collection_name not in db.list_collection_names():
-            db.create_collection(collection_name)
-
-    # Initialize collection references
-    users = db['users']
-    students = db['students']
-    activities = db['activities']
-    events = db['events']
-    resources_collection = db['resources']
-    announcements_collection = db['announcements']
+        if collection_name not in existing:
+            database.create_collection(collection_name)
 
     # Optional: Insert admin user if not exists
     admin_email = "sree123@gmail.com"
-    if not users.find_one({"email": admin_email}):
+    if not database['users'].find_one({"email": admin_email}):
         admin_user = {
             "name": "Sree",
             "email": admin_email,
             "password": generate_password_hash("1234"),
             "role": "admin"
         }
-        users.insert_one(admin_user)
+        database['users'].insert_one(admin_user)
         print("✅ Admin user inserted.")
 
-except Exception as e:
-    print(f"MongoDB Connection Error: {e}")
-    @app.route("/error")
-    def error():
-        return render_template('error.html', message="Database connection failed.")
-    exit(1)
-
 # Auth Decorator
 def login_required(f):
     @wraps(f)
@@ -124,7 +145,7 @@ def login():
                 'role': user['role']
             }
 
-            print("Login successful:", session['user'])  # ✅ Add this
+            logger.info("Login successful: %s (%s)", user['email'], user['role'])
 
             if user['role'] == 'admin':
                 return redirect(url_for('admin_dashboard'))
@@ -136,7 +157,7 @@ def login():
                 return redirect(url_for('staff_dashboard'))
         else:
             flash("Invalid email or password", "danger")
-            print("Login failed for:", email)  # ✅ Add this too
+            logger.info("Login failed for: %s", email)
 
     return render_template("login.html")  # ⚠️ Only if GET or failed login
 
@@ -160,36 +181,17 @@ def admin_dashboard():
 
 from datetime import datetime
 
-@app.route('/student_dashboard')
-@login_required
-def student_dashboard():
-    user = session.get('user', {})
-
-    # Fetch the student's data from the database
-    student = db['students'].find_one({'email': user.get('email')})
-
+def load_upcoming_events():
     # Ensure event dates are correct
-    for event in events.find():
-        if isinstance(event.get("date"), str):
-            try:
-                parsed_date = datetime.strptime(event["date"], "%Y-%m-%d")
-                events.update_one(
-                    {"_id": event["_id"]},
-                    {"$set": {"date": parsed_date}}
-                )
-            except Exception as e:
-                print(f"❌ Skipped: {event['title']} due to error: {e}")
-
-    if not student:
-        flash("Student record not found.")
-        return redirect(url_for('login'))
-
-    # Student specific data
-    grades = student.get('grades', {})
-    attendance_dict = student.get('attendance', {})
-    subjects = list(grades.keys())
-    grades_values = list(grades.values())
-    attendance = [attendance_dict.get(sub, 0) for sub in subjects]
+    for event in events.find({"date": {"$type": "string"}}):
+        try:
+            parsed_date = datetime.strptime(event["date"], "%Y-%m-%d")
+            events.update_one(
+                {"_id": event["_id"]},
+                {"$set": {"date": parsed_date}}
+            )
+        except Exception as e:
+            logger.warning("Skipped event %s due to error: %s", event['title'], e)
 
     # Fetch events created by staff for the student dashboard
     upcoming_events = list(events.find({"date": {"$gte": datetime.utcnow()}}).sort('date', 1))
@@ -199,9 +201,11 @@ def student_dashboard():
         "date": event["date"],
         "event_type": event["event_type"]
     } for event in upcoming_events]
+    return {'upcoming_events': upcoming_events_data}
 
+def load_announcements():
     # Fetch announcements and ensure the date is in datetime format
-    announcements_data = list(db['announcements'].find())  # Fetch announcements
+    announcements_data = list(announcements_collection.find())
     for announcement in announcements_data:
         for field in ['date', 'created_at', 'timestamp']:
             if isinstance(announcement.get(field), str):
@@ -209,7 +213,34 @@ def student_dashboard():
                     # Convert string to datetime
                     announcement[field] = datetime.strptime(announcement[field], '%Y-%m-%d %H:%M:%S')
                 except Exception as e:
-                    print(f"❌ Skipped: {announcement.get('title')} due to error: {e}")
+                    logger.warning("Skipped announcement %s due to error: %s", announcement.get('title'), e)
+    return {'announcements': announcements_data}
+
+@app.route('/student_dashboard')
+@login_required
+def student_dashboard():
+    user = session.get('user', {})
+
+    # Fetch the student's data from the database
+    student = db['students'].find_one({'email': user.get('email')})
+
+    if not student:
+        flash("Student record not found.")
+        return redirect(url_for('login'))
+
+    # Student specific data
+    grades = student.get('grades', {})
+    attendance_dict = student.get('attendance', {})
+    subjects = list(grades.keys())
+    grades_values = list(grades.values())
+    attendance = [attendance_dict.get(sub, 0) for sub in subjects]
+
+    # Rarely changing blocks are re-rendered only when their collection changes
+    versions = read_versions(data_versions, 'announcements', 'events')
+    announcements_html = fragment_cache.render(
+        'fragments/announcements.html', versions['announcements'], load_announcements)
+    upcoming_events_html = fragment_cache.render(
+        'fragments/upcoming_events.html', (versions['events'], datetime.utcnow().date()), load_upcoming_events)
 
     # Sample semester comparison data
     semester_comparison = {
@@ -227,9 +258,9 @@ def student_dashboard():
                        subjects=subjects,
                        grades_values=grades_values,
                        attendance=attendance,
-                       upcoming_events=upcoming_events_data,
+                       upcoming_events_html=upcoming_events_html,
                        semester_comparison=semester_comparison,
-                       announcements=announcements_data)
+                       announcements_html=announcements_html)
 
 # Faculty Dashboard
 @app.route('/faculty_dashboard')
@@ -284,10 +315,13 @@ def staff_dashboard():
         return redirect(url_for('login'))
 
     # Fetch events and notifications for staff dashboard
-    event_list = events.find().sort("timestamp", -1)
-    notification_list = activities.find().sort("timestamp", -1)
+    events_html = fragment_cache.render(
+        'fragments/staff_events.html', read_versions(data_versions, 'events')['events'],
+        lambda: {'events': list(events.find().sort("timestamp", -1))})
+    # Only the latest notification is shown; a list keeps the empty case falsy
+    notification_list = list(activities.find().sort("timestamp", -1).limit(1))
     
-    return render_template('staff_dashboard.html', events=event_list, notifications=notification_list)
+    return render_template('staff_dashboard.html', events_html=events_html, notifications=notification_list)
 
 # Create Event
 @app.route('/create_event', methods=['POST'])
@@ -309,6 +343,7 @@ def create_event():
             'created_by': session['user']['name'],
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         })
+        bump_version(data_versions, 'events')
         log_activity('Created a new event', session['user']['name'], session['user']['role'])
 
     return redirect(url_for('staff_dashboard'))
@@ -330,6 +365,7 @@ def send_notification():
             'role': session['user']['role'],
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         })
+        bump_version(data_versions, 'announcements')
 
         # Log staff activity
         log_activity('Sent a notification', session['user']['name'], session['user']['role'])
@@ -358,15 +394,19 @@ def view_users():
     return render_template('view_users.html', users=found_users)
 
 # API Routes
+def to_json_docs(docs):
+    # ObjectIds are not JSON serializable
+    return [{**doc, '_id': str(doc['_id'])} for doc in docs]
+
 @app.route('/get_events')
 @login_required
 def get_events():
-    return jsonify(list(events.find().sort('timestamp', -1).limit(20)))
+    return jsonify(to_json_docs(events.find().sort('timestamp', -1).limit(20)))
 
 @app.route('/get_notifications')
 @login_required
 def get_notifications():
-    return jsonify(list(activities.find().sort('timestamp', -1).limit(1)))
+    return jsonify(to_json_docs(activities.find().sort('timestamp', -1).limit(1)))
 
 # View Student Profile
 from urllib.parse import unquote_plus
@@ -446,7 +486,8 @@ def update_announcement():
             "timestamp": datetime.utcnow()
         }
 
-        announcements_collection.db.announcements.insert_one(announcement_doc)
+        announcements_collection.insert_one(announcement_doc)
+        bump_version(data_versions, 'announcements')
 
         return jsonify({"status": "success", "message": "Announcement stored successfully."}), 200
 
@@ -485,24 +526,117 @@ def update_resource():
 
     return redirect(url_for('staff_dashboard'))
 
-faq_data = [
-    {"question": "How can I reset my password?", "answer": "To reset your password, go to the 'Account Settings' page and click on 'Reset Password.'"},
-    {"question": "How can I check my marks?", "answer": "You can view your marks on the 'Student Portal' under the 'Marks' section."},
-    {"question": "How do I view my attendance?", "answer": "You can check your attendance in the 'Attendance' section of the Student Portal."},
-    {"question": "How do I update my profile?", "answer": "To update your profile, go to the 'Profile' page and click on 'Edit Profile.'"},
-    {"question": "How do I contact support?", "answer": "You can contact support through the 'Contact Us' section or email support@campus.com."},
-    # Add more relevant FAQs here
-]
+# FAQ retrieval: keyword shortlist re-ranked by embeddings, partitioned by role
+_faq_model = None
+_faq_model_lock = threading.Lock()
+
+def get_faq_model():
+    """Load the Sentence-Transformer model once, on first use."""
+    global _faq_model
+    if _faq_model is None:
+        with _faq_model_lock:
+            if _faq_model is None:
+                from sentence_transformers import SentenceTransformer
+                _faq_model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
+    return _faq_model
+
+# FAQs are managed in MongoDB (seeded from faq_data.json) and re-indexed when they change
+app.config.setdefault('FAQ_REFRESH_SECONDS', float(os.getenv('FAQ_REFRESH_SECONDS', '5')))
+faq_store = FAQStore(CollectionProxy(storage, 'faqs'), CollectionProxy(storage, 'faq_meta'),
+                     os.path.join(app.root_path, 'faq_data.json'), get_faq_model,
+                     refresh_interval=app.config['FAQ_REFRESH_SECONDS'])
+
+def admin_api_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if session.get('user', {}).get('role') != 'admin':
+            return jsonify({"status": "error", "message": "Unauthorized access."}), 403
+        return f(*args, **kwargs)
+    return decorated
 
-from sentence_transformers import SentenceTransformer, util
+@app.route('/admin/faqs', methods=['GET'])
+@admin_api_required
+def list_faqs():
+    return jsonify({"status": "success", "faqs": faq_store.list_faqs()})
 
-# Load the Sentence-Transformer model once
-model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
+@app.route('/admin/faqs', methods=['POST'])
+@admin_api_required
+def add_faq():
+    try:
+        faq = faq_store.add(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    log_activity('Added an FAQ', session['user']['name'], session['user']['role'])
+    return jsonify({"status": "success", "faq": faq}), 201
+
+@app.route('/admin/faqs/<faq_id>', methods=['PUT'])
+@admin_api_required
+def update_faq(faq_id):
+    try:
+        faq = faq_store.update(faq_id, request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if faq is None:
+        return jsonify({"status": "error", "message": "FAQ not found."}), 404
+    log_activity('Updated an FAQ', session['user']['name'], session['user']['role'])
+    return jsonify({"status": "success", "faq": faq})
+
+@app.route('/admin/faqs/<faq_id>', methods=['DELETE'])
+@admin_api_required
+def delete_faq(faq_id):
+    try:
+        deleted = faq_store.delete(faq_id)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if not deleted:
+        return jsonify({"status": "error", "message": "FAQ not found."}), 404
+    log_activity('Deleted an FAQ', session['user']['name'], session['user']['role'])
+    return jsonify({"status": "success"})
+
+faq_cli = AppGroup('faq', help="Manage the chatbot FAQ knowledge base.")
+
+@faq_cli.command('list')
+def faq_list_command():
+    for faq in faq_store.list_faqs():
+        click.echo(f"{faq['id']}  {faq['question']}")
+
+@faq_cli.command('add')
+@click.argument('question')
+@click.argument('answer')
+@click.option('--role', 'roles', multiple=True, help="Restrict to a role (repeatable).")
+def faq_add_command(question, answer, roles):
+    try:
+        faq = faq_store.add({'question': question, 'answer': answer, 'roles': list(roles)})
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Added {faq['id']}")
+
+@faq_cli.command('edit')
+@click.argument('faq_id')
+@click.argument('question')
+@click.argument('answer')
+@click.option('--role', 'roles', multiple=True, help="Restrict to a role (repeatable).")
+def faq_edit_command(faq_id, question, answer, roles):
+    try:
+        faq = faq_store.update(faq_id, {'question': question, 'answer': answer, 'roles': list(roles)})
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if faq is None:
+        raise click.ClickException("FAQ not found.")
+    click.echo(f"Updated {faq_id}")
+
+@faq_cli.command('delete')
+@click.argument('faq_id')
+def faq_delete_command(faq_id):
+    try:
+        deleted = faq_store.delete(faq_id)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if not deleted:
+        raise click.ClickException("FAQ not found.")
+    click.echo(f"Deleted {faq_id}")
 
-# Create embeddings for the FAQ data
-faq_questions = [faq["question"] for faq in faq_data]
-faq_answers = [faq["answer"] for faq in faq_data]
-faq_embeddings = model.encode(faq_questions, convert_to_tensor=True)
+app.cli.add_command(faq_cli)
 
 @app.route("/chatbot", methods=["GET", "POST"])
 def chatbot():
@@ -511,21 +645,16 @@ def chatbot():
 
     # Handle chatbot message (POST)
     data = request.get_json()
-    user_input = f"{data['role']} - {data['message']}"  # Combine role and message
-    user_embedding = model.encode(user_input, convert_to_tensor=True)
-
-    # Find the best match between the user query and the FAQ data
-    scores = util.pytorch_cos_sim(user_embedding, faq_embeddings)[0]
-    best_score_idx = int(scores.argmax())
-    best_score = float(scores[best_score_idx])
-
-    # Increase the similarity threshold to filter out irrelevant answers
-    if best_score >= 0.7:  # Increased threshold for better matches
-        answer = faq_answers[best_score_idx]
-    else:
-        answer = "❓ I'm not sure how to help with that. Please contact your department for support."
+    faq, _ = faq_store.search(data['message'], data.get('role'))
+    answer = faq['answer'] if faq else NO_MATCH_ANSWER
 
     return jsonify({"response": answer})
 
 if __name__ == "__main__":
+    try:
+        storage.database
+    except Exception as e:
+        print(f"MongoDB Connection Error: {e}")
+        exit(1)
+    fragments.precompile_templates(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,206 @@
+"""ASGI entry point with async versions of the JSON endpoints.
+
+    uvicorn asgi:app --workers 2
+
+``/get_events``, ``/get_notifications``, ``/chatbot`` (POST) and
+``/update_announcement`` are served on the event loop: MongoDB is reached
+through PyMongo's ``AsyncMongoClient`` and model inference runs in a bounded
+thread pool, so slow clients and slow queries do not hold a worker thread.
+Every other route is passed through to the Flask app, which also issues the
+session cookie these endpoints read.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from a2wsgi import WSGIMiddleware
+from itsdangerous import BadSignature
+from werkzeug.http import parse_accept_header
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, RedirectResponse, Response
+from starlette.routing import Mount, Route
+
+import assets
+import metrics
+from app import app as flask_app, faq_store, storage, to_json_docs
+from faq_search import NO_MATCH_ANSWER
+from fragments import bump_version
+from storage import MOCK_SCHEME
+
+flask_app.config.setdefault('CHATBOT_EXECUTOR_WORKERS', 2)
+
+
+class AsyncStorage:
+    """Async reads and writes against the app database.
+
+    mongomock has no async API, so under a ``mongomock://`` URI the calls go
+    through the shared sync storage in a worker thread instead.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._database = None
+
+    @property
+    def is_mock(self):
+        return (self.storage.app.config.get('MONGO_URI') or '').startswith(MOCK_SCHEME)
+
+    def database(self):
+        if self._database is None:
+            from pymongo import AsyncMongoClient
+            config = self.storage.app.config
+            client = AsyncMongoClient(config['MONGO_URI'], event_listeners=[metrics.mongo_listener])
+            self._database = client.get_default_database(config['MONGO_DBNAME'])
+        return self._database
+
+    async def latest(self, name, limit):
+        if self.is_mock:
+            collection = self.storage.collection(name)
+            return await asyncio.to_thread(lambda: list(collection.find().sort('timestamp', -1).limit(limit)))
+        cursor = self.database()[name].find().sort('timestamp', -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def insert_one(self, name, document):
+        if self.is_mock:
+            return await asyncio.to_thread(self.storage.collection(name).insert_one, document)
+        return await self.database()[name].insert_one(document)
+
+    async def bump_version(self, name):
+        # Same counter the Flask writers bump, so cached dashboard fragments are rebuilt
+        if self.is_mock:
+            return await asyncio.to_thread(bump_version, self.storage.collection('data_versions'), name)
+        return await self.database()['data_versions'].update_one(
+            {'_id': name}, {'$inc': {'version': 1}}, upsert=True)
+
+    async def close(self):
+        if self._database is not None:
+            await self._database.client.close()
+            self._database = None
+
+
+async_storage = AsyncStorage(storage)
+
+
+def session_user(request):
+    """The logged-in user from the Flask session cookie, or None."""
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if not cookie:
+        return None
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    try:
+        data = serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return None
+    return data.get('user')
+
+
+def json_response(data, status_code=200):
+    # Same encoder and compact layout as Flask's jsonify, so both serving paths return identical bodies
+    body = flask_app.json.dumps(data, indent=None, separators=(',', ':')) + '\n'
+    return Response(body, status_code=status_code, media_type='application/json')
+
+
+def compress(request, response):
+    """Compress the body like the Flask app's after-request hook, so both paths send the same bytes."""
+    config = flask_app.config
+    mimetype = (response.headers.get('content-type') or '').split(';')[0].strip()
+    if (not config['COMPRESS_RESPONSES']
+            or 'content-encoding' in response.headers
+            or not 200 <= response.status_code < 300
+            or mimetype not in assets.COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.headers.append('Vary', 'Accept-Encoding')
+    accepted = parse_accept_header(request.headers.get('accept-encoding'))
+    body, encoding = assets.compress_body(response.body, accepted, config)
+    if encoding:
+        response.body = body
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(body))
+    return response
+
+
+def endpoint(name, login=False):
+    """Record the request in the metrics registry, compress the response and optionally require a session."""
+    def decorator(f):
+        async def handler(request):
+            start = time.perf_counter()
+            if login and session_user(request) is None:
+                response = RedirectResponse('/login', status_code=302)
+            else:
+                response = compress(request, await f(request))
+            metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, f"async_{name}", request.method)
+            metrics.REQUESTS_TOTAL.inc(f"async_{name}", request.method, str(response.status_code))
+            return response
+        return handler
+    return decorator
+
+
+@endpoint('get_events', login=True)
+async def get_events(request):
+    return json_response(to_json_docs(await async_storage.latest('events', 20)))
+
+
+@endpoint('get_notifications', login=True)
+async def get_notifications(request):
+    return json_response(to_json_docs(await async_storage.latest('activities', 1)))
+
+
+@endpoint('chatbot')
+async def chatbot(request):
+    data = await request.json()
+    loop = asyncio.get_running_loop()
+    faq, _ = await loop.run_in_executor(request.app.state.inference_executor, faq_store.search,
+                                        data['message'], data.get('role'))
+    answer = faq['answer'] if faq else NO_MATCH_ANSWER
+    return JSONResponse({"response": answer})
+
+
+@endpoint('update_announcement')
+async def update_announcement(request):
+    try:
+        try:
+            announcement_data = await request.json()
+        except ValueError:
+            announcement_data = None
+
+        if not announcement_data or 'announcement' not in announcement_data:
+            return JSONResponse({"status": "error", "message": "Announcement data missing."}, status_code=400)
+
+        announcement_text = announcement_data['announcement']
+        staff_id = announcement_data.get('staff_id', 'Unknown Staff')
+
+        if not announcement_text.strip():
+            return JSONResponse({"status": "error", "message": "Announcement cannot be empty."}, status_code=400)
+
+        await async_storage.insert_one('announcements', {
+            "announcement": announcement_text,
+            "staff_id": staff_id,
+            "timestamp": datetime.utcnow()
+        })
+        await async_storage.bump_version('announcements')
+        return JSONResponse({"status": "success", "message": "Announcement stored successfully."})
+
+    except Exception as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Model inference is CPU bound, so it gets a small dedicated pool
+    app.state.inference_executor = ThreadPoolExecutor(
+        max_workers=flask_app.config['CHATBOT_EXECUTOR_WORKERS'], thread_name_prefix='chatbot')
+    yield
+    app.state.inference_executor.shutdown(wait=False)
+    await async_storage.close()
+
+
+app = Starlette(routes=[
+    Route('/get_events', get_events),
+    Route('/get_notifications', get_notifications),
+    Route('/chatbot', chatbot, methods=['POST']),
+    Route('/update_announcement', update_announcement, methods=['POST']),
+    Mount('/', app=WSGIMiddleware(flask_app)),
+], lifespan=lifespan)
@@ -0,0 +1,192 @@
+"""Static asset pipeline and response compression.
+
+``flask --app app assets vendor`` downloads third-party assets (Chart.js)
+into ``static/vendor/``; ``flask --app app assets build`` copies every static
+file to ``static/dist/`` under a content-hashed name, writes gzip (and
+brotli, when the ``brotli`` package is installed) siblings next to it and a
+``manifest.json``. Templates reference assets through ``asset_url()``, which
+resolves to the fingerprinted copy served from ``/assets/`` with an immutable
+``Cache-Control`` header. HTML/JSON/text responses are compressed on the fly.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import urllib.request
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Vendored file (relative to static/) -> upstream URL, also the fallback when not vendored
+VENDOR_ASSETS = {
+    'vendor/chart.umd.min.js': 'https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js',
+}
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript', 'application/json',
+    'image/svg+xml',
+}
+
+
+def _fingerprint(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _is_compressible(mimetype):
+    return mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def build(static_folder):
+    """Fingerprint and pre-compress everything under ``static_folder``. Returns the manifest."""
+    dist = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+    os.makedirs(dist)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist]
+        for filename in files:
+            source = os.path.join(root, filename)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            stem, ext = os.path.splitext(logical)
+            fingerprinted = f"{stem}.{_fingerprint(source)}{ext}"
+            target = os.path.join(dist, fingerprinted)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            manifest[logical] = fingerprinted
+
+            if _is_compressible(mimetypes.guess_type(filename)[0]):
+                with open(source, 'rb') as f:
+                    data = f.read()
+                with open(target + '.gz', 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    with open(target + '.br', 'wb') as f:
+                        f.write(brotli.compress(data, quality=11))
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def asset_url(filename):
+    """URL for a static asset: fingerprinted if built, plain static or upstream otherwise."""
+    fingerprinted = current_app.extensions['assets_manifest'].get(filename)
+    if fingerprinted:
+        return url_for('assets', filename=fingerprinted)
+    if filename in VENDOR_ASSETS and not os.path.exists(os.path.join(current_app.static_folder, filename)):
+        return VENDOR_ASSETS[filename]
+    return url_for('static', filename=filename)
+
+
+def serve_asset(filename):
+    """Serve a fingerprinted file, preferring a pre-compressed variant the client accepts."""
+    dist = os.path.join(current_app.static_folder, DIST_DIR)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    accepted = request.accept_encodings
+
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if accepted[candidate] and os.path.exists(os.path.join(dist, filename + suffix)):
+            encoding = candidate
+            filename += suffix
+            break
+
+    response = send_from_directory(dist, filename, mimetype=mimetype, max_age=31536000)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+def compress_body(data, accepted, config):
+    """Return ``(body, encoding)`` for a response body, ``encoding`` being None when left as is.
+
+    ``accepted`` is the parsed ``Accept-Encoding`` header. Shared by the WSGI
+    and ASGI serving paths so both send the same bytes.
+    """
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return data, None
+    if brotli is not None and accepted['br']:
+        return brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY']), 'br'
+    if accepted['gzip']:
+        return gzip.compress(data, compresslevel=config['COMPRESS_GZIP_LEVEL']), 'gzip'
+    return data, None
+
+
+def compress_response(response):
+    config = current_app.config
+    if (not config['COMPRESS_RESPONSES']
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not 200 <= response.status_code < 300
+            or not _is_compressible(response.mimetype)):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body, encoding = compress_body(response.get_data(), request.accept_encodings, config)
+    if encoding:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@click.group('assets', help="Vendor, fingerprint and pre-compress static assets.")
+def assets_cli():
+    pass
+
+
+@assets_cli.command('vendor')
+def vendor_command():
+    """Download third-party assets into static/."""
+    for filename, url in VENDOR_ASSETS.items():
+        target = os.path.join(current_app.static_folder, filename)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with urllib.request.urlopen(url) as response, open(target, 'wb') as f:
+            shutil.copyfileobj(response, f)
+        click.echo(f"Vendored {filename}")
+
+
+@assets_cli.command('build')
+def build_command():
+    """Write fingerprinted, pre-compressed copies to static/dist/."""
+    manifest = build(current_app.static_folder)
+    click.echo(f"Built {len(manifest)} assets" + ("" if brotli else " (brotli not installed, gzip only)"))
+
+
+def init_app(app):
+    app.config.setdefault('COMPRESS_RESPONSES', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BROTLI_QUALITY', 4)
+
+    app.extensions['assets_manifest'] = load_manifest(app.static_folder)
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+    app.add_template_global(asset_url)
+    app.after_request(compress_response)
+    app.cli.add_command(assets_cli)
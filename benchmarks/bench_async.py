@@ -0,0 +1,164 @@
+"""Concurrency comparison of the WSGI and ASGI serving paths.
+
+Seeds the database configured by --mongo-uri, starts the Flask app behind a
+WSGI server with a fixed thread pool (like a gunicorn gthread worker) and
+``asgi.app`` behind uvicorn, both in this process, then drives the JSON
+endpoints over HTTP at increasing concurrency and reports throughput and
+latency for each path.
+
+    python -m benchmarks.bench_async --mongo-uri mongodb://localhost:27017/campusApp_bench \\
+        --wsgi-threads 4 --concurrency 1 8 32 64
+
+Use a real MongoDB server for meaningful numbers: the in-memory mongomock
+backend has no network latency to overlap, and on the async path its calls
+run in threads. The target database is dropped and reseeded.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from werkzeug.serving import BaseWSGIServer  # noqa: E402
+
+from benchmarks.bench_routes import CHATBOT_MESSAGES, percentile  # noqa: E402
+from benchmarks.seed import BENCH_MONGO_URI, BENCH_PASSWORD, seed_database  # noqa: E402
+
+# name -> (method, path)
+ROUTES = {
+    'get_events': ('GET', '/get_events'),
+    'get_notifications': ('GET', '/get_notifications'),
+    'chatbot': ('POST', '/chatbot'),
+}
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug server that handles requests on a fixed-size thread pool."""
+
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_wsgi(flask_app, threads):
+    server = PooledWSGIServer('127.0.0.1', free_port(), flask_app, threads)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def start_asgi(asgi_app):
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(asgi_app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def drive(base_url, cookies, route, concurrency, total_requests):
+    method, path = ROUTES[route]
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, cookies=cookies, limits=limits, timeout=60) as client:
+        async def worker(index):
+            nonlocal errors
+            count = total_requests // concurrency + (1 if index < total_requests % concurrency else 0)
+            for i in range(count):
+                kwargs = {}
+                if route == 'chatbot':
+                    kwargs['json'] = {'role': 'student', 'message': CHATBOT_MESSAGES[i % len(CHATBOT_MESSAGES)]}
+                start = time.perf_counter()
+                response = await client.request(method, path, **kwargs)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mongo-uri', default=BENCH_MONGO_URI,
+                        help="database to seed and benchmark against (it is dropped first)")
+    parser.add_argument('--routes', nargs='+', choices=list(ROUTES), default=['get_events', 'get_notifications'])
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 8, 32, 64])
+    parser.add_argument('--requests', type=int, default=400, help="measured requests per route and level")
+    parser.add_argument('--wsgi-threads', type=int, default=4, help="request threads of the WSGI server")
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--activities', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    # Must be set before the app module connects
+    os.environ['MONGO_URI'] = args.mongo_uri
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    from app import app as flask_app, db
+    from asgi import app as asgi_app
+
+    try:
+        accounts = seed_database(db, users=10, students=10, events=args.events, activities=args.activities,
+                                 announcements=10)
+    except ValueError as e:
+        parser.error(str(e))
+
+    wsgi_server, wsgi_url = start_wsgi(flask_app, args.wsgi_threads)
+    asgi_server, asgi_url = start_asgi(asgi_app)
+    # Both paths read the same Flask session cookie
+    login = httpx.post(f"{wsgi_url}/login", data={'email': accounts['staff'], 'password': BENCH_PASSWORD})
+    cookies = dict(login.cookies)
+
+    header = f"{'route':<20}{'path':<6}{'conc':>6}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    try:
+        for route in args.routes:
+            for concurrency in args.concurrency:
+                for label, url in (('wsgi', wsgi_url), ('asgi', asgi_url)):
+                    r = asyncio.run(drive(url, cookies, route, concurrency, args.requests))
+                    print(f"{route:<20}{label:<6}{concurrency:>6}{r['requests']:>7}{r['errors']:>6}{r['rps']:>9.1f}"
+                          f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+    finally:
+        wsgi_server.shutdown()
+        asgi_server.should_exit = True
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Latency/throughput benchmark for the hot routes.
+
+Seeds the database configured by --mongo-uri with synthetic data, then drives
+each route in-process through the Flask test client at a fixed concurrency
+and reports p50/p95/p99 latency and MongoDB commands per request.
+
+    python -m benchmarks.bench_routes --mongo-uri mongodb://localhost:27017/campusApp_bench \\
+        --concurrency 8 --requests 400 --json results.json
+
+The target database is dropped and reseeded, so never point it at real data.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import metrics  # noqa: E402
+from benchmarks.seed import BENCH_MONGO_URI, BENCH_PASSWORD, seed_database  # noqa: E402
+
+CHATBOT_MESSAGES = [
+    "How can I check my marks?",
+    "How do I view my attendance?",
+    "How can I reset my password?",
+    "Where is the library?",
+]
+
+# name -> (method, path, login role, expected status)
+ROUTES = {
+    'login': ('POST', '/login', None, 302),
+    'student_dashboard': ('GET', '/student_dashboard', 'student', 200),
+    'faculty_dashboard': ('GET', '/faculty_dashboard', 'faculty', 200),
+    'staff_dashboard': ('GET', '/staff_dashboard', 'staff', 200),
+    'search_student': ('GET', '/search_student?query=student1', 'faculty', 200),
+    'chatbot': ('POST', '/chatbot', None, 200),
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def make_request(client, route, accounts, i):
+    method, path, _, _ = ROUTES[route]
+    if route == 'login':
+        return client.post(path, data={'email': accounts['student'], 'password': BENCH_PASSWORD})
+    if route == 'chatbot':
+        message = CHATBOT_MESSAGES[i % len(CHATBOT_MESSAGES)]
+        return client.post(path, json={'role': 'student', 'message': message})
+    return client.open(path, method=method)
+
+
+def run_route(flask_app, route, accounts, concurrency, total_requests, warmup):
+    _, _, role, expected_status = ROUTES[route]
+    clients = []
+    for _ in range(concurrency):
+        client = flask_app.test_client()
+        if role:
+            client.post('/login', data={'email': accounts[role], 'password': BENCH_PASSWORD})
+        for i in range(warmup):
+            make_request(client, route, accounts, i)
+        clients.append(client)
+
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(index):
+        nonlocal errors
+        client = clients[index]
+        count = total_requests // concurrency + (1 if index < total_requests % concurrency else 0)
+        local_latencies, local_errors = [], 0
+        for i in range(count):
+            start = time.perf_counter()
+            response = make_request(client, route, accounts, i)
+            local_latencies.append(time.perf_counter() - start)
+            if response.status_code != expected_status:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    mongo_before = metrics.REQUEST_MONGO_COMMANDS.snapshot(route)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    mongo_after = metrics.REQUEST_MONGO_COMMANDS.snapshot(route)
+
+    latencies.sort()
+    measured = mongo_after[0] - mongo_before[0]
+    return {
+        'route': route,
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'queries_per_request': (mongo_after[1] - mongo_before[1]) / measured if measured else 0.0,
+    }
+
+
+def print_report(results, baseline=None):
+    header = f"{'route':<20}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'q/req':>8}"
+    print(header)
+    print('-' * len(header))
+    previous = {r['route']: r for r in (baseline or [])}
+    for r in results:
+        line = (f"{r['route']:<20}{r['requests']:>7}{r['errors']:>6}{r['rps']:>9.1f}"
+                f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['queries_per_request']:>8.1f}")
+        old = previous.get(r['route'])
+        if old and old['p95_ms']:
+            line += f"  p95 {100 * (r['p95_ms'] - old['p95_ms']) / old['p95_ms']:+.1f}%"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mongo-uri', default=BENCH_MONGO_URI,
+                        help="database to seed and benchmark against (it is dropped first)")
+    parser.add_argument('--routes', nargs='+', choices=list(ROUTES), default=list(ROUTES))
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help="measured requests per route")
+    parser.add_argument('--warmup', type=int, default=2, help="unmeasured requests per worker")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--activities', type=int, default=1000)
+    parser.add_argument('--announcements', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42, help="random seed for the synthetic data")
+    parser.add_argument('--json', dest='json_path', help="write results to this file")
+    parser.add_argument('--compare', help="previous --json results to diff p95 against")
+    args = parser.parse_args(argv)
+
+    # Must be set before the app module connects
+    os.environ['MONGO_URI'] = args.mongo_uri
+    from app import app as flask_app, db
+
+    flask_app.config['TESTING'] = True
+    try:
+        accounts = seed_database(db, users=args.users, students=args.students, events=args.events,
+                                 activities=args.activities, announcements=args.announcements, seed=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = [run_route(flask_app, route, accounts, args.concurrency, args.requests, args.warmup)
+               for route in args.routes]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print_report(results, baseline)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Seed the campus database with synthetic data for benchmarks."""
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from fragments import bump_version
+from storage import DEFAULT_DATABASE
+
+BENCH_PASSWORD = "bench-password"
+
+# Benchmarks drop what they seed, so they default to a dedicated database
+BENCH_MONGO_URI = "mongodb://localhost:27017/campusApp_bench"
+
+SUBJECTS = ["Math", "Physics", "Chemistry", "DSA", "DBMS", "Networks", "English", "Lab"]
+EVENT_TYPES = ["Lecture", "Workshop", "Seminar", "Sports", "Cultural"]
+
+# One login per role used to drive the authenticated routes
+BENCH_ACCOUNTS = {
+    'admin': "admin@bench.campus",
+    'faculty': "faculty@bench.campus",
+    'staff': "staff@bench.campus",
+    'student': "student0@bench.campus",
+}
+
+
+def seed_database(db, users=50, students=500, events=200, activities=1000, announcements=100, seed=42):
+    """Drop and repopulate the app collections. Returns the per-role login emails."""
+    if db.name == DEFAULT_DATABASE:
+        raise ValueError(f"Refusing to seed the '{DEFAULT_DATABASE}' database; "
+                         f"put a dedicated database name in the URI, e.g. {BENCH_MONGO_URI}")
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    # Hashing is deliberately slow, so every seeded account shares one hash
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+
+    for name in ['users', 'students', 'events', 'activities', 'announcements']:
+        db[name].drop()
+
+    user_docs = [
+        {'name': role.title(), 'email': email, 'password': password_hash, 'role': role}
+        for role, email in BENCH_ACCOUNTS.items() if role != 'student'
+    ]
+    for i in range(users):
+        role = rng.choice(['faculty', 'staff'])
+        user_docs.append({'name': f"{role.title()} {i}", 'email': f"{role}{i}@bench.campus",
+                          'password': password_hash, 'role': role})
+
+    student_docs = []
+    for i in range(max(students, 1)):
+        email = f"student{i}@bench.campus"
+        subjects = rng.sample(SUBJECTS, 5)
+        user_docs.append({'name': f"Student {i}", 'email': email, 'password': password_hash, 'role': 'student'})
+        student_docs.append({
+            'name': f"Student {i}",
+            'email': email,
+            'grades': {sub: rng.randint(40, 100) for sub in subjects},
+            'attendance': {sub: rng.randint(50, 100) for sub in subjects},
+        })
+
+    db['users'].insert_many(user_docs)
+    db['students'].insert_many(student_docs)
+
+    if events:
+        db['events'].insert_many([{
+            'title': f"Event {i}",
+            'date': now + timedelta(days=rng.randint(-60, 60)),
+            'event_type': rng.choice(EVENT_TYPES),
+            'created_by': "Staff",
+            'timestamp': (now - timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+        } for i in range(events)])
+
+    if activities:
+        db['activities'].insert_many([{
+            'user_name': f"User {rng.randint(0, users)}",
+            'role': rng.choice(['admin', 'faculty', 'staff']),
+            'action': rng.choice(["Created a new event", "Sent a notification", "Updated a record"]),
+            'timestamp': (now - timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+        } for i in range(activities)])
+
+    if announcements:
+        db['announcements'].insert_many([{
+            'message': f"Announcement {i}",
+            'sender': "Staff",
+            'role': 'staff',
+            'timestamp': (now - timedelta(hours=i)).strftime('%Y-%m-%d %H:%M:%S'),
+        } for i in range(announcements)])
+
+    # Invalidate cached dashboard fragments of an app already serving this database
+    for name in ['events', 'announcements']:
+        bump_version(db['data_versions'], name)
+
+    return dict(BENCH_ACCOUNTS)
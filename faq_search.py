@@ -0,0 +1,163 @@
+"""FAQ retrieval for the chatbot.
+
+Queries are answered in stages, cheapest first:
+
+1. an exact match on the normalised question text;
+2. a BM25 shortlist from an inverted index over the FAQ questions,
+   re-ranked by embedding similarity;
+3. only when no FAQ shares a keyword with the query, a dense scan.
+
+FAQs are partitioned by audience: an entry may carry a ``roles`` list
+(``student``, ``faculty``, ``staff``, ``admin``) and is then only matched for
+those roles; entries without one are shared by everybody, and a missing or
+unknown role sees only the shared entries. The role is used to pick the
+partition and is no longer mixed into the embedded text. Repeated questions
+are indexed once, so the shortlist holds distinct questions.
+"""
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+import metrics
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'at', 'can', 'do', 'does', 'for', 'how', 'i', 'in', 'is', 'it', 'me', 'my',
+    'of', 'on', 'or', 'the', 'to', 'what', 'when', 'where', 'which', 'who', 'why', 'with', 'you', 'your',
+}
+
+ROLES = ('student', 'faculty', 'staff', 'admin')
+
+NO_MATCH_ANSWER = "❓ I'm not sure how to help with that. Please contact your department for support."
+
+
+def tokenize(text):
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+def normalize(text):
+    return ' '.join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def load_faqs(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class FAQIndex:
+    def __init__(self, faqs, model_loader, shortlist_size=20, threshold=0.7, k1=1.5, b=0.75, embeddings=None):
+        self.faqs = list(faqs)
+        self.model_loader = model_loader
+        self.shortlist_size = shortlist_size
+        self.threshold = threshold
+        self.k1 = k1
+        self.b = b
+
+        # Many FAQs repeat a question (with varied answers), so the index holds one
+        # representative per question and audience: the first one stored
+        self._exact = defaultdict(list)  # normalised question -> representative doc ids
+        self._postings = defaultdict(list)  # term -> [(doc id, term frequency)]
+        self._doc_lengths = {}
+        self._shared = set()
+        self._by_role = defaultdict(set)
+        seen = set()
+        for doc_id, faq in enumerate(self.faqs):
+            question = normalize(faq['question'])
+            roles = faq.get('roles')
+            key = (question, frozenset(roles or ()))
+            if key in seen:
+                continue
+            seen.add(key)
+            self._exact[question].append(doc_id)
+            terms = Counter(tokenize(faq['question']))
+            for term, tf in terms.items():
+                self._postings[term].append((doc_id, tf))
+            self._doc_lengths[doc_id] = sum(terms.values())
+            if roles:
+                for role in roles:
+                    self._by_role[role].add(doc_id)
+            else:
+                self._shared.add(doc_id)
+        self._representatives = sorted(self._doc_lengths)
+
+        count = len(self._representatives)
+        self._avg_length = (sum(self._doc_lengths.values()) / count) if count else 0.0
+        self._idf = {term: math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5))
+                     for term, p in self._postings.items()}
+
+        # question text -> embedding, filled on demand; entries for questions
+        # that are no longer indexed are dropped when a previous cache is reused
+        questions = {self.faqs[doc_id]['question'] for doc_id in self._representatives}
+        self._embeddings = {q: v for q, v in (embeddings or {}).items() if q in questions}
+        self._embed_lock = threading.Lock()
+
+    def _visible(self, doc_id, role):
+        # Unknown or missing roles only see the shared FAQs
+        return doc_id in self._shared or (role in ROLES and doc_id in self._by_role.get(role, ()))
+
+    def lexical_search(self, query, role=None, limit=None):
+        """BM25-ranked ``[(doc id, score)]`` over the distinct questions visible to ``role``."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self._postings[term]:
+                if not self._visible(doc_id, role):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / (self._avg_length or 1))
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit or self.shortlist_size]
+
+    @property
+    def embeddings(self):
+        """Snapshot of the embedding cache, safe to take while queries are still filling it."""
+        with self._embed_lock:
+            return dict(self._embeddings)
+
+    def embed_missing(self, questions=None):
+        """Embed the given (default: all) indexed questions that have no cached embedding."""
+        if questions is None:
+            questions = [self.faqs[doc_id]['question'] for doc_id in self._representatives]
+        missing = [q for q in dict.fromkeys(questions) if q not in self._embeddings]
+        if missing:
+            with self._embed_lock:
+                missing = [q for q in missing if q not in self._embeddings]
+                if missing:
+                    vectors = self.model_loader().encode(missing, convert_to_tensor=True)
+                    self._embeddings.update(zip(missing, vectors))
+
+    def _question_embeddings(self, doc_ids):
+        questions = [self.faqs[doc_id]['question'] for doc_id in doc_ids]
+        self.embed_missing(questions)
+        import torch
+        return torch.stack([self._embeddings[q] for q in questions])
+
+    def search(self, query, role=None):
+        """Return ``(faq, score)`` for the best match, or ``(None, score)`` below the threshold."""
+        for doc_id in self._exact.get(normalize(query), ()):
+            if self._visible(doc_id, role):
+                metrics.CHATBOT_QUERIES.inc('exact')
+                return self.faqs[doc_id], 1.0
+
+        candidates = [doc_id for doc_id, _ in self.lexical_search(query, role)]
+        if candidates:
+            metrics.CHATBOT_QUERIES.inc('shortlist')
+        else:
+            metrics.CHATBOT_QUERIES.inc('dense')
+            candidates = [doc_id for doc_id in self._representatives if self._visible(doc_id, role)]
+        if not candidates:
+            return None, 0.0
+
+        from sentence_transformers import util
+        model = self.model_loader()
+        with metrics.CHATBOT_ENCODE_LATENCY.time():
+            query_embedding = model.encode(query, convert_to_tensor=True)
+        scores = util.cos_sim(query_embedding, self._question_embeddings(candidates))[0]
+        best = int(scores.argmax())
+        best_score = float(scores[best])
+        if best_score < self.threshold:
+            return None, best_score
+        return self.faqs[candidates[best]], best_score
@@ -0,0 +1,151 @@
+"""Admin-managed FAQ knowledge base for the chatbot.
+
+FAQs live in the ``faqs`` collection, seeded once from ``faq_data.json``. A
+version counter in ``faq_meta`` is bumped on every change; each worker checks
+it at most every ``refresh_interval`` seconds and rebuilds its ``FAQIndex`` in
+a background thread, reusing the embeddings of unchanged questions. The new
+index replaces the old one with a single reference assignment, so in-flight
+``/chatbot`` requests keep using the index they started with.
+"""
+import threading
+import time
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+
+from faq_search import ROLES, FAQIndex, load_faqs
+
+META_ID = 'faqs'
+
+
+def clean_faq(data):
+    """Validate an FAQ payload. Raises ValueError with a user-facing message."""
+    if not isinstance(data, dict):
+        raise ValueError("FAQ data missing.")
+    question = data.get('question')
+    answer = data.get('answer')
+    if not isinstance(question, str) or not question.strip():
+        raise ValueError("Question cannot be empty.")
+    if not isinstance(answer, str) or not answer.strip():
+        raise ValueError("Answer cannot be empty.")
+    faq = {'question': question.strip(), 'answer': answer.strip()}
+
+    roles = data.get('roles')
+    if roles:
+        if not isinstance(roles, list) or any(role not in ROLES for role in roles):
+            raise ValueError(f"Roles must be a list of: {', '.join(ROLES)}.")
+        faq['roles'] = roles
+    return faq
+
+
+def parse_id(faq_id):
+    try:
+        return ObjectId(faq_id)
+    except (InvalidId, TypeError):
+        raise ValueError("Invalid FAQ id.")
+
+
+def serialize(faq):
+    return {'id': str(faq['_id']), 'question': faq['question'], 'answer': faq['answer'],
+            'roles': faq.get('roles', [])}
+
+
+class FAQStore:
+    def __init__(self, collection, meta_collection, seed_path, model_loader, refresh_interval=5.0):
+        self.collection = collection
+        self.meta = meta_collection
+        self.seed_path = seed_path
+        self.model_loader = model_loader
+        self.refresh_interval = refresh_interval
+
+        self._index = None
+        self._version = None
+        self._checked_at = 0.0
+        self._load_lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    # Reads
+
+    def _seed(self):
+        # Only the worker that creates the meta document seeds the collection
+        existing = self.meta.find_one_and_update(
+            {'_id': META_ID}, {'$setOnInsert': {'version': 0}}, upsert=True)
+        if existing is None and self.collection.estimated_document_count() == 0:
+            self.collection.insert_many(load_faqs(self.seed_path))
+            # Workers that loaded while the seed was being inserted pick it up on their next check
+            self.meta.update_one({'_id': META_ID}, {'$inc': {'version': 1}})
+
+    def _read_version(self):
+        meta = self.meta.find_one({'_id': META_ID})
+        return meta['version'] if meta else 0
+
+    def _build(self, previous=None):
+        version = self._read_version()
+        faqs = list(self.collection.find().sort('_id', 1))
+        embeddings = previous.embeddings if previous else None
+        index = FAQIndex(faqs, self.model_loader, embeddings=embeddings)
+        # Re-embed only new or edited questions, and only once the model is in use
+        if embeddings:
+            index.embed_missing()
+        return index, version
+
+    def index(self):
+        """Current index, loading it on first use and scheduling a rebuild when stale."""
+        if self._index is None:
+            with self._load_lock:
+                if self._index is None:
+                    self._seed()
+                    self._index, self._version = self._build()
+                    self._checked_at = time.monotonic()
+        elif time.monotonic() - self._checked_at >= self.refresh_interval:
+            self._checked_at = time.monotonic()
+            if self._read_version() != self._version and not self._rebuild_lock.locked():
+                threading.Thread(target=self.refresh, daemon=True).start()
+        return self._index
+
+    def refresh(self):
+        """Rebuild the index from the collection and swap it in."""
+        with self._rebuild_lock:
+            index, version = self._build(previous=self._index)
+            self._index, self._version = index, version
+            self._checked_at = time.monotonic()
+
+    def search(self, query, role=None):
+        return self.index().search(query, role)
+
+    def list_faqs(self):
+        self.index()  # make sure the collection is seeded first
+        return [serialize(faq) for faq in self.collection.find().sort('_id', 1)]
+
+    # Writes: each bumps the shared version and refreshes this worker right away
+
+    def _changed(self):
+        self.meta.update_one({'_id': META_ID}, {'$inc': {'version': 1}}, upsert=True)
+        self.refresh()
+
+    def add(self, data):
+        self.index()  # make sure the collection is seeded first
+        faq = clean_faq(data)
+        faq['_id'] = self.collection.insert_one(faq).inserted_id
+        self._changed()
+        return serialize(faq)
+
+    def update(self, faq_id, data):
+        self.index()
+        faq = clean_faq(data)
+        update = {'$set': faq}
+        if 'roles' not in faq:
+            update['$unset'] = {'roles': ''}
+        result = self.collection.update_one({'_id': parse_id(faq_id)}, update)
+        if result.matched_count == 0:
+            return None
+        self._changed()
+        return serialize({'_id': parse_id(faq_id), **faq})
+
+    def delete(self, faq_id):
+        self.index()
+        result = self.collection.delete_one({'_id': parse_id(faq_id)})
+        if result.deleted_count == 0:
+            return False
+        self._changed()
+        return True
@@ -0,0 +1,81 @@
+"""Template fragment caching and compiled-template caching.
+
+Rarely changing blocks (announcements, upcoming events) are rendered from
+their own templates under ``templates/fragments/`` and kept in memory, keyed
+by a per-collection version counter in the ``data_versions`` collection, so a
+dashboard request only re-renders them after the underlying collection
+changes. Compiled templates are stored
+in a Jinja bytecode cache on disk, so restarted workers skip recompiling.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from flask import render_template
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+
+def bump_version(versions, name):
+    """Mark the data behind ``name`` as changed. Every writer of a cached collection calls this."""
+    versions.update_one({'_id': name}, {'$inc': {'version': 1}}, upsert=True)
+
+
+def read_versions(versions, *names):
+    """Current version of each name, read in a single query; unversioned names are 0."""
+    found = {doc['_id']: doc['version'] for doc in versions.find({'_id': {'$in': list(names)}})}
+    return {name: found.get(name, 0) for name in names}
+
+
+class FragmentCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, template_name, version, context_factory):
+        """Return the rendered fragment for ``version``, calling ``context_factory()``
+        for the template context only on a miss."""
+        key = (template_name, version)
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                return html
+
+        html = Markup(render_template(template_name, **context_factory()).strip())
+
+        with self._lock:
+            # Older versions of the same fragment can never be hit again
+            for stale in [k for k in self._entries if k[0] == template_name]:
+                del self._entries[stale]
+            self._entries[key] = html
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+def init_app(app):
+    app.config.setdefault('JINJA_BYTECODE_CACHE_DIR', os.getenv('JINJA_BYTECODE_CACHE_DIR'))
+
+    # Must be configured before the Jinja environment is first created
+    cache_dir = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    else:
+        bytecode_cache = FileSystemBytecodeCache()
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': bytecode_cache}
+
+
+def precompile_templates(app):
+    """Load every template once so no request pays for compilation."""
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
@@ -0,0 +1,274 @@
+"""Request-level performance metrics for the campus app.
+
+Collects per-route latency, MongoDB command counts and durations (through
+pymongo command monitoring), template render time and chatbot encode time,
+and exposes them in the Prometheus text format on ``/metrics``. The endpoint
+requires ``METRICS_TOKEN`` as a bearer token, or ``METRICS_PUBLIC=1`` to be
+served without one.
+"""
+import hmac
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import (Response, abort, before_render_template, current_app, g, has_request_context, request,
+                   template_rendered)
+from pymongo import monitoring
+
+slow_request_logger = logging.getLogger('campus.slow_requests')
+
+# Latency buckets in seconds, count buckets in commands per request
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self, *label_values):
+        """Return ``(count, sum)`` for one label combination."""
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                return 0, 0.0
+            return series[-1], series[-2]
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labels, label_values, [('le', _format_number(bound))])
+                    lines.append(f'{self.name}_bucket{labels} {count}')
+                labels = _format_labels(self.labels, label_values, [('le', '+Inf')])
+                lines.append(f'{self.name}_bucket{labels} {series[-1]}')
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f'{self.name}_sum{labels} {_format_number(series[-2])}')
+                lines.append(f'{self.name}_count{labels} {series[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def counter(self, name, help_text, labels=()):
+        return self._metrics.setdefault(name, Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._metrics.setdefault(name, Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'campus_request_duration_seconds', 'Request latency by route.', ('endpoint', 'method'))
+REQUESTS_TOTAL = registry.counter(
+    'campus_requests_total', 'Requests served by route and status code.', ('endpoint', 'method', 'status'))
+REQUEST_MONGO_COMMANDS = registry.histogram(
+    'campus_request_mongo_commands', 'MongoDB commands issued per request.', ('endpoint',), COUNT_BUCKETS)
+REQUEST_MONGO_SECONDS = registry.histogram(
+    'campus_request_mongo_seconds', 'Time spent in MongoDB commands per request.', ('endpoint',))
+MONGO_COMMAND_LATENCY = registry.histogram(
+    'campus_mongo_command_duration_seconds', 'MongoDB command latency by command name.', ('command',))
+MONGO_COMMAND_FAILURES = registry.counter(
+    'campus_mongo_command_failures_total', 'Failed MongoDB commands by command name.', ('command',))
+TEMPLATE_RENDER_LATENCY = registry.histogram(
+    'campus_template_render_seconds', 'Template render time by template name.', ('template',))
+CHATBOT_ENCODE_LATENCY = registry.histogram(
+    'campus_chatbot_encode_seconds', 'Time spent encoding chatbot queries.')
+CHATBOT_QUERIES = registry.counter(
+    'campus_chatbot_queries_total', 'Chatbot queries by retrieval path (exact, shortlist, dense).', ('path',))
+
+
+class RequestMetrics:
+    """Per-request accumulator stored on ``flask.g``."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_starts = []
+
+
+def current_request_metrics():
+    if not has_request_context():
+        return None
+    return g.get('request_metrics')
+
+
+def record_mongo_command(command_name, seconds, failed=False):
+    MONGO_COMMAND_LATENCY.observe(seconds, command_name)
+    if failed:
+        MONGO_COMMAND_FAILURES.inc(command_name)
+    current = current_request_metrics()
+    if current is not None:
+        current.mongo_commands += 1
+        current.mongo_seconds += seconds
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Feeds pymongo command events into the registry and the current request."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        record_mongo_command(event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        record_mongo_command(event.command_name, event.duration_micros / 1e6, failed=True)
+
+
+mongo_listener = MongoCommandListener()
+
+
+def _before_render(sender, template, context, **extra):
+    current = current_request_metrics()
+    if current is not None:
+        current.template_starts.append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    current = current_request_metrics()
+    if current is None or not current.template_starts:
+        return
+    elapsed = time.perf_counter() - current.template_starts.pop()
+    # Only top-level renders count towards the request total
+    if not current.template_starts:
+        current.template_seconds += elapsed
+    TEMPLATE_RENDER_LATENCY.observe(elapsed, template.name or '<string>')
+
+
+def _start_request():
+    g.request_metrics = RequestMetrics()
+
+
+def _finish_request(response):
+    current = g.pop('request_metrics', None)
+    if current is None:
+        return response
+
+    elapsed = time.perf_counter() - current.start
+    endpoint = request.endpoint or 'unmatched'
+    REQUEST_LATENCY.observe(elapsed, endpoint, request.method)
+    REQUESTS_TOTAL.inc(endpoint, request.method, str(response.status_code))
+    REQUEST_MONGO_COMMANDS.observe(current.mongo_commands, endpoint)
+    REQUEST_MONGO_SECONDS.observe(current.mongo_seconds, endpoint)
+
+    threshold_ms = current_app.config['SLOW_REQUEST_THRESHOLD_MS']
+    sample_rate = current_app.config['SLOW_REQUEST_SAMPLE_RATE']
+    if threshold_ms and elapsed * 1000 >= threshold_ms and random.random() < sample_rate:
+        slow_request_logger.warning(
+            "Slow request: %s %s endpoint=%s status=%s total=%.1fms mongo_commands=%d mongo=%.1fms template=%.1fms",
+            request.method, request.path, endpoint, response.status_code, elapsed * 1000,
+            current.mongo_commands, current.mongo_seconds * 1000, current.template_seconds * 1000)
+    return response
+
+
+def metrics_view():
+    token = current_app.config['METRICS_TOKEN']
+    if token:
+        expected = f'Bearer {token}'.encode()
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected):
+            abort(401)
+    elif not current_app.config['METRICS_PUBLIC']:
+        # Route names and latency profiles are not public unless explicitly opted in
+        abort(404)
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    app.config.setdefault('METRICS_ENABLED', os.getenv('METRICS_ENABLED', '1') != '0')
+    app.config.setdefault('METRICS_TOKEN', os.getenv('METRICS_TOKEN'))
+    # Without a token, /metrics is only served when this is set
+    app.config.setdefault('METRICS_PUBLIC', os.getenv('METRICS_PUBLIC', '0') == '1')
+    # 0 disables the slow-request log
+    app.config.setdefault('SLOW_REQUEST_THRESHOLD_MS', float(os.getenv('SLOW_REQUEST_THRESHOLD_MS', '0')))
+    app.config.setdefault('SLOW_REQUEST_SAMPLE_RATE', float(os.getenv('SLOW_REQUEST_SAMPLE_RATE', '1.0')))
+
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
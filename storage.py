@@ -0,0 +1,134 @@
+"""MongoDB access for the campus app.
+
+The connection is opened lazily from ``app.config['MONGO_URI']`` the first
+time a collection is used, so tests and benchmarks can point the app at a
+different database after import. A ``mongomock://`` URI selects an in-memory
+Mongo-compatible backend (requires the ``mongomock`` package), which lets the
+suite and the benchmarks run without a MongoDB server.
+"""
+import threading
+import time
+from functools import wraps
+
+from pymongo import MongoClient
+
+import metrics
+
+MOCK_SCHEME = 'mongomock://'
+DEFAULT_DATABASE = 'campusApp'
+
+# Collection methods reported to the metrics registry under the mock backend,
+# mapped to the server command they stand in for
+_MOCK_COMMANDS = {
+    'find': 'find', 'find_one': 'find', 'count_documents': 'aggregate', 'estimated_document_count': 'count',
+    'aggregate': 'aggregate', 'distinct': 'distinct', 'insert_one': 'insert', 'insert_many': 'insert',
+    'update_one': 'update', 'update_many': 'update', 'replace_one': 'update', 'delete_one': 'delete',
+    'delete_many': 'delete', 'find_one_and_update': 'findAndModify', 'find_one_and_delete': 'findAndModify',
+    'bulk_write': 'bulkWrite', 'drop': 'drop', 'create_index': 'createIndexes',
+}
+
+
+def create_client(uri):
+    """Return a client for ``uri``; ``mongomock://`` URIs get an in-memory client."""
+    if uri and uri.startswith(MOCK_SCHEME):
+        import mongomock
+        return mongomock.MongoClient('mongodb://' + uri[len(MOCK_SCHEME):])
+    return MongoClient(uri, event_listeners=[metrics.mongo_listener])
+
+
+class _CountingCollection:
+    """Reports mongomock calls to the metrics registry, which pymongo's command
+    monitoring would otherwise do. Cursor-returning calls are counted once."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        command = _MOCK_COMMANDS.get(name)
+        if command is None:
+            return attr
+
+        @wraps(attr)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                metrics.record_mongo_command(command, time.perf_counter() - start)
+        return timed
+
+
+class Storage:
+    def __init__(self, app=None):
+        self.app = None
+        self.client = None
+        self._database = None
+        self.is_mock = False
+        self._lock = threading.Lock()
+        self._connect_hooks = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('MONGO_DBNAME', DEFAULT_DATABASE)
+
+    def on_connect(self, f):
+        """Register ``f(database)`` to run once after the connection is opened."""
+        self._connect_hooks.append(f)
+        return f
+
+    @property
+    def database(self):
+        if self._database is None:
+            with self._lock:
+                if self._database is None:
+                    self._connect()
+        return self._database
+
+    def _connect(self):
+        uri = self.app.config.get('MONGO_URI')
+        self.is_mock = bool(uri) and uri.startswith(MOCK_SCHEME)
+        self.client = create_client(uri)
+        database = self.client.get_default_database(self.app.config['MONGO_DBNAME'])
+        for hook in self._connect_hooks:
+            hook(database)
+        self._database = database
+
+    def collection(self, name):
+        collection = self.database[name]
+        return _CountingCollection(collection) if self.is_mock else collection
+
+
+class DatabaseProxy:
+    """Module-level stand-in for a ``Database`` that resolves on each access."""
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    def __getitem__(self, name):
+        return self._storage.collection(name)
+
+    @property
+    def name(self):
+        # Set per instance by mongomock, so the class lookup below would miss it
+        return self._storage.database.name
+
+    def __getattr__(self, name):
+        database = self._storage.database
+        if hasattr(type(database), name):
+            return getattr(database, name)
+        # Anything that is not a Database attribute is a collection name
+        return self._storage.collection(name)
+
+
+class CollectionProxy:
+    """Module-level stand-in for a named collection that resolves on each access."""
+
+    def __init__(self, storage, name):
+        self._storage = storage
+        self.name = name
+
+    def __getattr__(self, name):
+        return getattr(self._storage.collection(self.name), name)
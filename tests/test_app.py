@@ -1,16 +1,64 @@
+import gzip
+import time
 import pytest
-from app import app, db
-from werkzeug.security import generate_password_hash
+import mongomock
+import torch
 import sys
 import os
 import urllib.parse  # Import for URL encoding
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Must be set before the app module is imported, so no test can reach the database from .env
+TEST_MONGO_URI = "mongomock://localhost/test_db"
+os.environ['MONGO_URI'] = TEST_MONGO_URI
+
+import assets  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+from app import app, db  # noqa: E402
+from asgi import app as asgi_app  # noqa: E402
+from faq_search import FAQIndex, tokenize  # noqa: E402
+from faq_store import FAQStore  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+FAQ_SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'faq_data.json')
+
+class StubModel:
+    """Bag-of-words encoder that records every text it is asked to embed."""
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.encoded = []
+
+    def _vector(self, text):
+        vector = torch.zeros(64)
+        vector[0] = 1.0  # constant component so no text encodes to zero
+        for token in tokenize(text):
+            vector[1 + self.vocabulary.setdefault(token, len(self.vocabulary))] += 1.0
+        return vector
+
+    def encode(self, texts, convert_to_tensor=True):
+        if isinstance(texts, str):
+            self.encoded.append(texts)
+            return self._vector(texts)
+        self.encoded.extend(texts)
+        return torch.stack([self._vector(text) for text in texts])
+
+STUB_FAQS = [
+    {"question": "When does the library open?", "answer": "8 AM."},
+    {"question": "Where is the canteen?", "answer": "Block A."},
+    {"question": "How do I pay fees?", "answer": "Accounts office."},
+    {"question": "How do I submit grades?", "answer": "Faculty portal.", "roles": ["faculty"]},
+]
+
+def stub_index():
+    model = StubModel()
+    return FAQIndex(STUB_FAQS, model_loader=lambda: model), model
+
 @pytest.fixture
 def client():
     app.config['TESTING'] = True
-    app.config['MONGO_URI'] = "mongodb://localhost:27017/test_db"
+    app.config['MONGO_URI'] = TEST_MONGO_URI
     with app.test_client() as client:
         yield client
 
@@ -153,3 +201,187 @@ def test_logout(client, init_db):
     assert response.status_code == 200
     assert b"Logged out successfully." in response.data
     assert b"Login" in response.data  # Check that Login button is visible after logout
+
+def test_metrics_endpoint(client):
+    client.get('/')
+    assert client.get('/metrics').status_code == 404
+
+    app.config['METRICS_TOKEN'] = "metrics-secret"
+    try:
+        assert client.get('/metrics').status_code == 401
+        response = client.get('/metrics', headers={'Authorization': 'Bearer metrics-secret'})
+    finally:
+        app.config['METRICS_TOKEN'] = None
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert b'campus_request_duration_seconds_bucket{endpoint="home",method="GET"' in response.data
+    assert b'campus_request_mongo_commands_count{endpoint="home"}' in response.data
+
+def test_student_dashboard_shows_new_announcement(client, init_db):
+    db.users.insert_one({
+        "name": "Student Two",
+        "email": "student2@example.com",
+        "password": generate_password_hash("password123"),
+        "role": "student"
+    })
+    db.students.insert_one({"name": "Student Two", "email": "student2@example.com", "grades": {}, "attendance": {}})
+    client.post('/login', data=dict(
+        email="student2@example.com",
+        password="password123"
+    ), follow_redirects=True)
+    client.get('/student_dashboard')
+
+    # The cached announcements fragment must be rebuilt after an announcement is posted
+    client.post('/update_announcement', json={"announcement": "Library closed on Friday"})
+    response = client.get('/student_dashboard')
+    assert response.status_code == 200
+    assert b"Library closed on Friday" in response.data
+
+def test_html_response_is_gzip_compressed(client):
+    response = client.get('/login', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b"Login" in gzip.decompress(response.data)
+
+def test_build_fingerprints_and_precompresses_assets(tmp_path):
+    (tmp_path / 'style.css').write_text("body { color: red; }\n" * 50)
+    manifest = assets.build(str(tmp_path))
+    fingerprinted = manifest['style.css']
+    assert fingerprinted.startswith('style.') and fingerprinted.endswith('.css')
+    assert (tmp_path / 'dist' / fingerprinted).exists()
+    assert gzip.decompress((tmp_path / 'dist' / (fingerprinted + '.gz')).read_bytes()).startswith(b"body")
+    assert assets.load_manifest(str(tmp_path)) == manifest
+
+def test_chatbot_answers_exact_question(client):
+    response = client.post('/chatbot', json={"role": "student", "message": "How can I check my marks?"})
+    assert response.status_code == 200
+    assert response.get_json()["response"] == "View them under the 'Marks' section in the Student Portal."
+
+def test_faq_exact_match_never_loads_model():
+    def model_loader():
+        raise AssertionError("model loaded for an exact match")
+    faq, score = FAQIndex(STUB_FAQS, model_loader).search("where is the CANTEEN", role="student")
+    assert faq["answer"] == "Block A." and score == 1.0
+
+def test_faq_search_embeds_only_shortlisted_questions():
+    index, model = stub_index()
+    faq, score = index.search("library open time", role="student")
+    assert faq["answer"] == "8 AM." and score >= index.threshold
+    assert model.encoded == ["library open time", "When does the library open?"]
+
+def test_faq_search_below_threshold_returns_no_faq():
+    index, model = stub_index()
+    faq, score = index.search("library parking", role="student")
+    assert faq is None
+    assert 0 < score < index.threshold
+
+def test_faq_dense_fallback_only_covers_visible_faqs():
+    index, model = stub_index()
+    faq, _ = index.search("hello there", role="student")
+    assert faq is None
+    assert model.encoded[1:] == [f["question"] for f in STUB_FAQS if "roles" not in f]
+
+def test_faq_shortlist_holds_distinct_questions():
+    faqs = [{"question": "How do I change my course?", "answer": f"Variant {i}."} for i in range(25)]
+    faqs.append({"question": "Can I change my registered email?", "answer": "Contact the admin office."})
+    index = FAQIndex(faqs, model_loader=None)
+    shortlist = [index.faqs[doc_id]["question"] for doc_id, _ in index.lexical_search("change email and course")]
+    assert sorted(shortlist) == ["Can I change my registered email?", "How do I change my course?"]
+    assert index.search("how do i change my course", role="student")[0]["answer"] == "Variant 0."
+
+def test_faq_lexical_search_respects_roles():
+    index = FAQIndex([
+        {"question": "How do I submit grades?", "answer": "Faculty portal.", "roles": ["faculty"]},
+        {"question": "How do I check my grades?", "answer": "Student portal."},
+    ], model_loader=None)
+    assert [doc_id for doc_id, _ in index.lexical_search("grades", role="student")] == [1]
+    assert sorted(doc_id for doc_id, _ in index.lexical_search("grades", role="faculty")) == [0, 1]
+    assert [doc_id for doc_id, _ in index.lexical_search("grades", role=None)] == [1]
+    assert [doc_id for doc_id, _ in index.lexical_search("grades", role="visitor")] == [1]
+    assert index.lexical_search("library timings", role="student") == []
+
+def test_admin_faq_changes_reach_chatbot(client, init_db):
+    client.post('/login', data=dict(
+        email="testuser@example.com",
+        password="password123"
+    ), follow_redirects=True)
+    response = client.post('/admin/faqs', json={"question": "Where is the robotics lab?", "answer": "Block C, room 12."})
+    assert response.status_code == 201
+    faq_id = response.get_json()["faq"]["id"]
+
+    response = client.post('/chatbot', json={"role": "student", "message": "Where is the robotics lab?"})
+    assert response.get_json()["response"] == "Block C, room 12."
+
+    response = client.put(f'/admin/faqs/{faq_id}', json={"question": "Where is the robotics lab?", "answer": "Block D."})
+    assert response.status_code == 200
+    response = client.post('/chatbot', json={"role": "student", "message": "Where is the robotics lab?"})
+    assert response.get_json()["response"] == "Block D."
+
+    assert client.delete(f'/admin/faqs/{faq_id}').status_code == 200
+    assert client.delete(f'/admin/faqs/{faq_id}').status_code == 404
+
+def test_faq_list_seeds_fresh_database():
+    database = mongomock.MongoClient().db
+    store = FAQStore(database.faqs, database.faq_meta, FAQ_SEED_PATH, model_loader=None)
+    assert len(store.list_faqs()) == database.faqs.count_documents({}) > 0
+
+def test_faq_worker_loading_during_seed_picks_up_seeded_faqs():
+    database = mongomock.MongoClient().db
+    seeding = FAQStore(database.faqs, database.faq_meta, FAQ_SEED_PATH, model_loader=None)
+    waiting = FAQStore(database.faqs, database.faq_meta, FAQ_SEED_PATH, model_loader=None, refresh_interval=0)
+    # The other worker has claimed the seed but not inserted it yet
+    database.faq_meta.insert_one({'_id': 'faqs', 'version': 0})
+    assert waiting.index().faqs == []
+
+    database.faq_meta.delete_many({})
+    seeding.index()
+    waiting.index()
+    deadline = time.monotonic() + 5
+    while not waiting.index().faqs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(waiting.index().faqs) == len(seeding.index().faqs) > 0
+
+def test_faq_admin_api_requires_admin(client, init_db):
+    client.post('/login', data=dict(
+        email="staffuser@example.com",
+        password="password123"
+    ), follow_redirects=True)
+    response = client.post('/admin/faqs', json={"question": "Q?", "answer": "A."})
+    assert response.status_code == 403
+
+def test_get_events_returns_json(client, init_db):
+    client.post('/login', data=dict(
+        email="staffuser@example.com",
+        password="password123"
+    ), follow_redirects=True)
+    client.post('/create_event', data=dict(title="JSON Event", date="2025-05-21", event_type="Seminar"))
+    response = client.get('/get_events')
+    assert response.status_code == 200
+    assert "JSON Event" in [event["title"] for event in response.get_json()]
+
+def test_async_endpoints(init_db):
+    with TestClient(asgi_app) as async_client:
+        response = async_client.get('/get_events', follow_redirects=False)
+        assert response.status_code == 302
+
+        async_client.post('/login', data=dict(email="staffuser@example.com", password="password123"))
+        response = async_client.get('/get_events')
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+
+        response = async_client.post('/update_announcement', json={"announcement": "Async hello"})
+        assert response.json()["status"] == "success"
+        assert db.announcements.find_one({"announcement": "Async hello"}) is not None
+
+def test_async_and_wsgi_json_responses_match(client, init_db):
+    db.events.insert_many([{"title": f"Event {i}", "date": "2025-05-21", "event_type": "Seminar",
+                            "timestamp": f"2025-05-20 10:{i:02d}:00"} for i in range(20)])
+    login = dict(email="staffuser@example.com", password="password123")
+    client.post('/login', data=login)
+    wsgi_response = client.get('/get_events', headers={'Accept-Encoding': 'gzip'})
+    with TestClient(asgi_app) as async_client:
+        async_client.post('/login', data=login)
+        response = async_client.get('/get_events', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.content == gzip.decompress(wsgi_response.data)
+    db.events.drop()
@@ -1,4 +1,9 @@
+import gzip
+import tempfile
+import time
 import unittest
+import mongomock
+import torch
 from werkzeug.security import generate_password_hash
 import sys
 import os
@@ -7,8 +12,54 @@ from urllib.parse import quote_plus
 # Ensure that the parent directory is included in the import path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Must be set before the app module is imported, so no test can reach the database from .env
+TEST_MONGO_URI = "mongomock://localhost/test_db"
+os.environ['MONGO_URI'] = TEST_MONGO_URI
+
 # Import the app and db modules
+import assets
+from starlette.testclient import TestClient
 from app import app, db
+from asgi import app as asgi_app
+from faq_search import FAQIndex, tokenize
+from faq_store import FAQStore
+
+FAQ_SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'faq_data.json')
+
+
+class StubModel:
+    """Bag-of-words encoder that records every text it is asked to embed."""
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.encoded = []
+
+    def _vector(self, text):
+        vector = torch.zeros(64)
+        vector[0] = 1.0  # constant component so no text encodes to zero
+        for token in tokenize(text):
+            vector[1 + self.vocabulary.setdefault(token, len(self.vocabulary))] += 1.0
+        return vector
+
+    def encode(self, texts, convert_to_tensor=True):
+        if isinstance(texts, str):
+            self.encoded.append(texts)
+            return self._vector(texts)
+        self.encoded.extend(texts)
+        return torch.stack([self._vector(text) for text in texts])
+
+
+STUB_FAQS = [
+    {"question": "When does the library open?", "answer": "8 AM."},
+    {"question": "Where is the canteen?", "answer": "Block A."},
+    {"question": "How do I pay fees?", "answer": "Accounts office."},
+    {"question": "How do I submit grades?", "answer": "Faculty portal.", "roles": ["faculty"]},
+]
+
+
+def stub_index():
+    model = StubModel()
+    return FAQIndex(STUB_FAQS, model_loader=lambda: model), model
 
 
 class AppTestCase(unittest.TestCase):
@@ -16,7 +67,7 @@ class AppTestCase(unittest.TestCase):
     def setUp(self):
         # Configure test environment
         app.config['TESTING'] = True
-        app.config['MONGO_URI'] = "mongodb://localhost:27017/test_db"
+        app.config['MONGO_URI'] = TEST_MONGO_URI
         self.client = app.test_client()
 
         # Reset DB
@@ -142,6 +193,197 @@ class AppTestCase(unittest.TestCase):
         self.assertIn(b"Logged out successfully.", response.data)
         self.assertIn(b"Login", response.data)
 
+    def test_metrics_endpoint(self):
+        self.client.get('/')
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+        app.config['METRICS_TOKEN'] = "metrics-secret"
+        try:
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', headers={'Authorization': 'Bearer metrics-secret'})
+        finally:
+            app.config['METRICS_TOKEN'] = None
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/plain')
+        self.assertIn(b'campus_request_duration_seconds_bucket{endpoint="home",method="GET"', response.data)
+        self.assertIn(b'campus_request_mongo_commands_count{endpoint="home"}', response.data)
+
+    def test_student_dashboard_shows_new_announcement(self):
+        db.users.insert_one({
+            "name": "Student Two",
+            "email": "student2@example.com",
+            "password": generate_password_hash("password123"),
+            "role": "student"
+        })
+        db.students.insert_one({"name": "Student Two", "email": "student2@example.com", "grades": {}, "attendance": {}})
+        self.client.post('/login', data=dict(
+            email="student2@example.com",
+            password="password123"
+        ), follow_redirects=True)
+        self.client.get('/student_dashboard')
+
+        # The cached announcements fragment must be rebuilt after an announcement is posted
+        self.client.post('/update_announcement', json={"announcement": "Library closed on Friday"})
+        response = self.client.get('/student_dashboard')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Library closed on Friday", response.data)
+
+    def test_html_response_is_gzip_compressed(self):
+        response = self.client.get('/login', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn(b"Login", gzip.decompress(response.data))
+
+    def test_build_fingerprints_and_precompresses_assets(self):
+        with tempfile.TemporaryDirectory() as static_dir:
+            with open(os.path.join(static_dir, 'style.css'), 'w') as f:
+                f.write("body { color: red; }\n" * 50)
+            manifest = assets.build(static_dir)
+            fingerprinted = manifest['style.css']
+            self.assertTrue(fingerprinted.startswith('style.') and fingerprinted.endswith('.css'))
+            self.assertTrue(os.path.exists(os.path.join(static_dir, 'dist', fingerprinted)))
+            with open(os.path.join(static_dir, 'dist', fingerprinted + '.gz'), 'rb') as f:
+                self.assertTrue(gzip.decompress(f.read()).startswith(b"body"))
+            self.assertEqual(assets.load_manifest(static_dir), manifest)
+
+    def test_chatbot_answers_exact_question(self):
+        response = self.client.post('/chatbot', json={"role": "student", "message": "How can I check my marks?"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["response"], "View them under the 'Marks' section in the Student Portal.")
+
+    def test_faq_exact_match_never_loads_model(self):
+        def model_loader():
+            raise AssertionError("model loaded for an exact match")
+        faq, score = FAQIndex(STUB_FAQS, model_loader).search("where is the CANTEEN", role="student")
+        self.assertEqual(faq["answer"], "Block A.")
+        self.assertEqual(score, 1.0)
+
+    def test_faq_search_embeds_only_shortlisted_questions(self):
+        index, model = stub_index()
+        faq, score = index.search("library open time", role="student")
+        self.assertEqual(faq["answer"], "8 AM.")
+        self.assertGreaterEqual(score, index.threshold)
+        self.assertEqual(model.encoded, ["library open time", "When does the library open?"])
+
+    def test_faq_search_below_threshold_returns_no_faq(self):
+        index, model = stub_index()
+        faq, score = index.search("library parking", role="student")
+        self.assertIsNone(faq)
+        self.assertTrue(0 < score < index.threshold)
+
+    def test_faq_dense_fallback_only_covers_visible_faqs(self):
+        index, model = stub_index()
+        faq, _ = index.search("hello there", role="student")
+        self.assertIsNone(faq)
+        self.assertEqual(model.encoded[1:], [f["question"] for f in STUB_FAQS if "roles" not in f])
+
+    def test_faq_shortlist_holds_distinct_questions(self):
+        faqs = [{"question": "How do I change my course?", "answer": f"Variant {i}."} for i in range(25)]
+        faqs.append({"question": "Can I change my registered email?", "answer": "Contact the admin office."})
+        index = FAQIndex(faqs, model_loader=None)
+        shortlist = [index.faqs[doc_id]["question"] for doc_id, _ in index.lexical_search("change email and course")]
+        self.assertEqual(sorted(shortlist), ["Can I change my registered email?", "How do I change my course?"])
+        self.assertEqual(index.search("how do i change my course", role="student")[0]["answer"], "Variant 0.")
+
+    def test_faq_lexical_search_respects_roles(self):
+        index = FAQIndex([
+            {"question": "How do I submit grades?", "answer": "Faculty portal.", "roles": ["faculty"]},
+            {"question": "How do I check my grades?", "answer": "Student portal."},
+        ], model_loader=None)
+        self.assertEqual([doc_id for doc_id, _ in index.lexical_search("grades", role="student")], [1])
+        self.assertEqual(sorted(doc_id for doc_id, _ in index.lexical_search("grades", role="faculty")), [0, 1])
+        self.assertEqual([doc_id for doc_id, _ in index.lexical_search("grades", role=None)], [1])
+        self.assertEqual([doc_id for doc_id, _ in index.lexical_search("grades", role="visitor")], [1])
+        self.assertEqual(index.lexical_search("library timings", role="student"), [])
+
+    def test_admin_faq_changes_reach_chatbot(self):
+        self.client.post('/login', data=dict(
+            email="testuser@example.com",
+            password="password123"
+        ), follow_redirects=True)
+        response = self.client.post('/admin/faqs', json={"question": "Where is the robotics lab?", "answer": "Block C, room 12."})
+        self.assertEqual(response.status_code, 201)
+        faq_id = response.get_json()["faq"]["id"]
+
+        response = self.client.post('/chatbot', json={"role": "student", "message": "Where is the robotics lab?"})
+        self.assertEqual(response.get_json()["response"], "Block C, room 12.")
+
+        response = self.client.put(f'/admin/faqs/{faq_id}', json={"question": "Where is the robotics lab?", "answer": "Block D."})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/chatbot', json={"role": "student", "message": "Where is the robotics lab?"})
+        self.assertEqual(response.get_json()["response"], "Block D.")
+
+        self.assertEqual(self.client.delete(f'/admin/faqs/{faq_id}').status_code, 200)
+        self.assertEqual(self.client.delete(f'/admin/faqs/{faq_id}').status_code, 404)
+
+    def test_faq_list_seeds_fresh_database(self):
+        database = mongomock.MongoClient().db
+        store = FAQStore(database.faqs, database.faq_meta, FAQ_SEED_PATH, model_loader=None)
+        self.assertGreater(len(store.list_faqs()), 0)
+        self.assertEqual(len(store.list_faqs()), database.faqs.count_documents({}))
+
+    def test_faq_worker_loading_during_seed_picks_up_seeded_faqs(self):
+        database = mongomock.MongoClient().db
+        seeding = FAQStore(database.faqs, database.faq_meta, FAQ_SEED_PATH, model_loader=None)
+        waiting = FAQStore(database.faqs, database.faq_meta, FAQ_SEED_PATH, model_loader=None, refresh_interval=0)
+        # The other worker has claimed the seed but not inserted it yet
+        database.faq_meta.insert_one({'_id': 'faqs', 'version': 0})
+        self.assertEqual(waiting.index().faqs, [])
+
+        database.faq_meta.delete_many({})
+        seeding.index()
+        waiting.index()
+        deadline = time.monotonic() + 5
+        while not waiting.index().faqs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertGreater(len(seeding.index().faqs), 0)
+        self.assertEqual(len(waiting.index().faqs), len(seeding.index().faqs))
+
+    def test_faq_admin_api_requires_admin(self):
+        self.client.post('/login', data=dict(
+            email="staffuser@example.com",
+            password="password123"
+        ), follow_redirects=True)
+        response = self.client.post('/admin/faqs', json={"question": "Q?", "answer": "A."})
+        self.assertEqual(response.status_code, 403)
+
+    def test_get_events_returns_json(self):
+        self.client.post('/login', data=dict(
+            email="staffuser@example.com",
+            password="password123"
+        ), follow_redirects=True)
+        self.client.post('/create_event', data=dict(title="JSON Event", date="2025-05-21", event_type="Seminar"))
+        response = self.client.get('/get_events')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("JSON Event", [event["title"] for event in response.get_json()])
+
+    def test_async_endpoints(self):
+        with TestClient(asgi_app) as async_client:
+            response = async_client.get('/get_events', follow_redirects=False)
+            self.assertEqual(response.status_code, 302)
+
+            async_client.post('/login', data=dict(email="staffuser@example.com", password="password123"))
+            response = async_client.get('/get_events')
+            self.assertEqual(response.status_code, 200)
+            self.assertIsInstance(response.json(), list)
+
+            response = async_client.post('/update_announcement', json={"announcement": "Async hello"})
+            self.assertEqual(response.json()["status"], "success")
+            self.assertIsNotNone(db.announcements.find_one({"announcement": "Async hello"}))
+
+    def test_async_and_wsgi_json_responses_match(self):
+        db.events.insert_many([{"title": f"Event {i}", "date": "2025-05-21", "event_type": "Seminar",
+                                "timestamp": f"2025-05-20 10:{i:02d}:00"} for i in range(20)])
+        login = dict(email="staffuser@example.com", password="password123")
+        self.client.post('/login', data=login)
+        wsgi_response = self.client.get('/get_events', headers={'Accept-Encoding': 'gzip'})
+        with TestClient(asgi_app) as async_client:
+            async_client.post('/login', data=login)
+            response = async_client.get('/get_events', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertEqual(response.content, gzip.decompress(wsgi_response.data))
+        db.events.drop()
+
 
 if __name__ == '__main__':
     unittest.main()